@@ -8,12 +8,15 @@ import segyio
 import numpy as np
 import os
 import sys
+from kernels import synthesize_traces
 
 
 def create_mini_segy(output_file='mini_sample.segy', 
                      n_traces=50, 
                      n_samples=250,
-                     sample_interval_us=2000):
+                     sample_interval_us=2000,
+                     preallocate=True,
+                     seed=None):
     """
     테스트용 미니 SEGY 파일 생성
     
@@ -22,6 +25,8 @@ def create_mini_segy(output_file='mini_sample.segy',
         n_traces: 트레이스 수 (기본 50)
         n_samples: 샘플 수 (기본 250)
         sample_interval_us: 샘플 간격 (마이크로초, 기본 2000 = 2ms)
+        preallocate: 기록 전에 파일 전체 크기를 미리 할당할지 여부
+        seed: 노이즈 생성용 난수 시드 (None이면 매번 다른 노이즈)
     """
     print(f"미니 SEGY 샘플 파일 생성 중...")
     print(f"  출력 파일: {output_file}")
@@ -38,6 +43,15 @@ def create_mini_segy(output_file='mini_sample.segy',
     spec.xlines = range(1)
     
     with segyio.create(output_file, spec) as f:
+        # 파일 크기를 미리 할당하여 희소(sparse) 쓰기로 인한 지연 방지
+        if preallocate and hasattr(os, 'posix_fallocate'):
+            expected_size = 3600 + n_traces * (240 + n_samples * 4)
+            fd = os.open(output_file, os.O_RDWR)
+            try:
+                os.posix_fallocate(fd, 0, expected_size)
+            finally:
+                os.close(fd)
+        
         # 텍스트 헤더 생성 (3200 bytes)
         lines = [
             "C01 MINI SEGY SAMPLE FILE FOR TESTING                                   ",
@@ -80,47 +94,39 @@ def create_mini_segy(output_file='mini_sample.segy',
             segyio.BinField.MeasurementSystem: 1,  # Meters
         }
         
-        # 트레이스 데이터 생성
+        # 트레이스 데이터 생성 (전체 트레이스를 (n_traces, n_samples) 행렬로 한 번에 계산)
         print("\n트레이스 데이터 생성 중...")
-        for i in range(n_traces):
-            # 복합 신호 생성
-            t = np.linspace(0, n_samples * sample_interval_us / 1000000, n_samples)
-            
-            # 다양한 주파수의 사인파 조합
-            freq1 = 20 + (i % 10) * 5  # 20-65 Hz
-            freq2 = 10 + (i % 5) * 3   # 10-22 Hz
-            
-            signal1 = np.sin(2 * np.pi * freq1 * t)
-            signal2 = 0.5 * np.sin(2 * np.pi * freq2 * t)
-            noise = np.random.normal(0, 0.1, n_samples)
-            
-            # 시간에 따른 감쇠 추가 (실제 지진파 특성)
-            decay = np.exp(-t * 2)
-            
-            # 최종 트레이스 데이터
-            trace_data = (signal1 + signal2) * decay + noise
-            
-            # 정규화
-            if np.max(np.abs(trace_data)) > 0:
-                trace_data = trace_data / np.max(np.abs(trace_data))
-            
-            f.trace[i] = trace_data.astype(np.float32)
-            
-            # 트레이스 헤더
-            f.header[i] = {
+        rng = np.random.default_rng(seed)
+        noise = rng.standard_normal((n_traces, n_samples), dtype=np.float32) * 0.1
+        traces = synthesize_traces(n_traces, n_samples, sample_interval_us / 1000000, noise)
+        
+        # 트레이스 데이터는 한 번에 기록
+        f.trace.raw[:] = traces.astype(np.float32)
+        
+        # 트레이스 헤더 (모든 트레이스에 공통인 필드는 한 번만 구성)
+        common_header = {
+            segyio.TraceField.FieldRecord: 1,
+            segyio.TraceField.CROSSLINE_3D: 1,
+            segyio.TraceField.CDP_Y: 0,
+            segyio.TraceField.SourceGroupScalar: -100,  # 1/100 스케일
+            segyio.TraceField.TRACE_SAMPLE_COUNT: n_samples,
+            segyio.TraceField.TRACE_SAMPLE_INTERVAL: sample_interval_us,
+        }
+        headers = [
+            {
+                **common_header,
                 segyio.TraceField.TRACE_SEQUENCE_LINE: i + 1,
                 segyio.TraceField.TRACE_SEQUENCE_FILE: i + 1,
-                segyio.TraceField.FieldRecord: 1,
                 segyio.TraceField.TraceNumber: i + 1,
                 segyio.TraceField.CDP: i + 1,
                 segyio.TraceField.INLINE_3D: i + 1,
-                segyio.TraceField.CROSSLINE_3D: 1,
                 segyio.TraceField.CDP_X: i * 25,  # 25m 간격
-                segyio.TraceField.CDP_Y: 0,
-                segyio.TraceField.SourceGroupScalar: -100,  # 1/100 스케일
-                segyio.TraceField.TRACE_SAMPLE_COUNT: n_samples,
-                segyio.TraceField.TRACE_SAMPLE_INTERVAL: sample_interval_us,
             }
+            for i in range(n_traces)
+        ]
+        
+        for i, header in enumerate(headers):
+            f.header[i] = header
             
             # 진행상황 표시
             if (i + 1) % 10 == 0 or i == n_traces - 1:
@@ -164,8 +170,8 @@ def create_multiple_samples():
     print("모든 샘플 파일 생성 완료!")
     print("=" * 70)
     
-    # 파일 목록 출력
-    print("\n생성된 파일:")
+    # 파일 목록 출력 (한 번에 출력)
+    lines = ["\n생성된 파일:"]
     for filename, _, _ in samples:
         if os.path.exists(filename):
             size = os.path.getsize(filename)
@@ -173,7 +179,8 @@ def create_multiple_samples():
                 size_str = f"{size / (1024 * 1024):.2f} MB"
             else:
                 size_str = f"{size / 1024:.2f} KB"
-            print(f"  ✓ {filename:<30} ({size_str})")
+            lines.append(f"  ✓ {filename:<30} ({size_str})")
+    sys.stdout.write('\n'.join(lines) + '\n')
 
 
 def main():
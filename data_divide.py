@@ -5,41 +5,322 @@ SEG-Y 데이터를 분할하고 저장하는 모듈
 
 import segyio
 import numpy as np
-from typing import Optional, Tuple, List, Dict, Any
+from typing import Optional, Tuple, List, Dict, Any, Union
 from pathlib import Path
+from dataclasses import dataclass
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack
+import json
 import os
-from header_loading import SEGYHeaderLoader
-from data_loading import SEGYDataLoader
+import sys
+import threading
+from header_loading import SEGYHeaderLoader, open_trace_memmap
+from data_loading import SEGYDataLoader, _check_order
+
+
+# 저장 dtype별 raw 파일 확장자
+_RAW_EXTENSIONS = {
+    'float32': '.f32',
+    'int16': '.i16',
+}
+
+# int16 양자화 최대값
+_INT16_MAX = 32767
+
+
+def quantize_chunk(data: np.ndarray) -> Tuple[np.ndarray, float]:
+    """
+    청크를 최대 절대값 기준으로 int16 양자화
+    
+    Args:
+        data: 양자화할 데이터
+        
+    Returns:
+        (int16 배열, scale) - 원래 값 ≈ 양자화 값 * scale / 32767
+    """
+    scale = float(np.abs(data).max()) if data.size else 0.0
+    if scale == 0.0:
+        scale = 1.0
+    quantized = np.round(data * (_INT16_MAX / scale)).astype(np.int16)
+    return quantized, scale
+
+
+def load_quantized_chunk(data_path: str, metadata: Dict[str, Any]) -> np.ndarray:
+    """
+    save_chunk_as_npy로 저장한 청크를 float32로 복원하여 로드
+    
+    Args:
+        data_path: 청크 데이터 파일 경로 (.npy, .f32, .i16)
+        metadata: 청크 메타데이터 (dtype, scale, raw 파일의 경우 shape 필요)
+        
+    Returns:
+        float32 데이터 배열
+    """
+    dtype = metadata.get('dtype', 'float32')
+    
+    if data_path.endswith('.npy'):
+        data = np.load(data_path, allow_pickle=False)
+    else:
+        data = np.fromfile(data_path, dtype=dtype).reshape(metadata['shape'])
+    
+    if dtype == 'int16':
+        return data.astype(np.float32) * np.float32(metadata['scale'] / _INT16_MAX)
+    return data.astype(np.float32, copy=False)
+
+
+def load_store_chunk(store_path: str, metadata: Dict[str, Any],
+                     chunk_id: Tuple[int, int]) -> np.ndarray:
+    """
+    save_chunks_as_store로 저장한 단일 저장소에서 청크 하나를 float32로 로드
+    
+    Args:
+        store_path: 저장소 파일 경로 (.npy)
+        metadata: 저장소 메타데이터 (tile_shape, dtype, int16의 경우 scales 필요)
+        chunk_id: (trace_chunk_idx, depth_chunk_idx)
+        
+    Returns:
+        float32 청크 데이터 배열
+    """
+    t_idx, d_idx = chunk_id
+    tile_traces, tile_samples = metadata['tile_shape']
+    
+    # 규칙적인 타일이므로 청크 위치를 인덱스 곱으로 바로 계산
+    store = np.load(store_path, mmap_mode='r', allow_pickle=False)
+    tile = store[t_idx * tile_traces:(t_idx + 1) * tile_traces,
+                 d_idx * tile_samples:(d_idx + 1) * tile_samples]
+    
+    if metadata.get('dtype', 'float32') == 'int16':
+        scale = metadata['scales'][t_idx][d_idx]
+        return tile.astype(np.float32) * np.float32(scale / _INT16_MAX)
+    return np.array(tile, dtype=np.float32)
+
+
+def _chunk_bounds(total: int, chunk_size: int) -> Tuple[np.ndarray, np.ndarray]:
+    """0 ~ total 범위를 chunk_size 간격으로 나눈 (시작 배열, 종료 배열) 계산"""
+    starts = np.arange(0, total, chunk_size, dtype=np.int64)
+    ends = np.minimum(starts + chunk_size, total)
+    return starts, ends
+
+
+# ChunkGrid 레코드 구조 (청크당 한 행)
+_CHUNK_DT = np.dtype([
+    ('trace_chunk_index', 'i8'),
+    ('depth_chunk_index', 'i8'),
+    ('chunk_number', 'i8'),
+    ('trace_start', 'i8'),
+    ('trace_end', 'i8'),
+    ('sample_start', 'i8'),
+    ('sample_end', 'i8'),
+    ('time_start_ms', 'f8'),
+    ('time_end_ms', 'f8'),
+])
+
+
+def _chunk_field(name: str) -> property:
+    """ChunkGrid 레코드 필드를 열(column) 배열 뷰로 노출하는 property 생성"""
+    return property(lambda self: self.records[name], doc=f"청크별 {name} 배열 (records의 뷰)")
+
+
+@dataclass(eq=False)
+class ChunkGrid:
+    """
+    그리드 분할 결과 (divide_by_grid 반환값)
+    
+    청크 정보를 청크당 dict 대신 구조화 NumPy 배열(_CHUNK_DT) 하나에 저장합니다.
+    각 필드는 grid.trace_start처럼 열 배열로 접근할 수 있고,
+    기존 코드와의 호환을 위해 인덱싱/반복 시에는 청크 정보 dict를 반환합니다.
+    """
+    records: np.ndarray
+    
+    trace_chunk_index = _chunk_field('trace_chunk_index')
+    depth_chunk_index = _chunk_field('depth_chunk_index')
+    chunk_number = _chunk_field('chunk_number')
+    trace_start = _chunk_field('trace_start')
+    trace_end = _chunk_field('trace_end')
+    sample_start = _chunk_field('sample_start')
+    sample_end = _chunk_field('sample_end')
+    time_start_ms = _chunk_field('time_start_ms')
+    time_end_ms = _chunk_field('time_end_ms')
+    
+    @classmethod
+    def empty(cls, num_chunks: int) -> 'ChunkGrid':
+        """num_chunks개 청크를 담을 ChunkGrid 미리 할당 (값은 채워지지 않음)"""
+        return cls(np.empty(num_chunks, dtype=_CHUNK_DT))
+    
+    @classmethod
+    def from_dict_list(cls, chunks: List[Dict[str, Any]]) -> 'ChunkGrid':
+        """청크 정보 dict 리스트로부터 ChunkGrid 생성"""
+        records = np.array([
+            (*chunk['chunk_id'], chunk['chunk_number'], *chunk['trace_range'],
+             *chunk['sample_range'], *chunk['time_range_ms'])
+            for chunk in chunks
+        ], dtype=_CHUNK_DT)
+        return cls(records)
+    
+    @property
+    def num_traces(self) -> np.ndarray:
+        """청크별 트레이스 수"""
+        return self.trace_end - self.trace_start
+    
+    @property
+    def num_samples(self) -> np.ndarray:
+        """청크별 샘플 수"""
+        return self.sample_end - self.sample_start
+    
+    def __len__(self) -> int:
+        return len(self.records)
+    
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self.chunk_info(i) for i in range(*index.indices(len(self)))]
+        return self.chunk_info(index)
+    
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self.chunk_info(i)
+    
+    def __eq__(self, other) -> bool:
+        # 다른 ChunkGrid와는 레코드 배열 전체를, 청크 정보 dict 리스트와는 dict 단위로 비교
+        if isinstance(other, ChunkGrid):
+            return np.array_equal(self.records, other.records)
+        if isinstance(other, list):
+            return self.to_dict_list() == other
+        return NotImplemented
+    
+    def chunk_info(self, index: int) -> Dict[str, Any]:
+        """
+        index번째 청크 정보를 dict로 반환
+        
+        Returns:
+            {
+                'chunk_id': (trace_chunk_idx, depth_chunk_idx),
+                'chunk_number': 번호,
+                'trace_range': (start, end),
+                'sample_range': (start, end),
+                'time_range_ms': (start, end),
+                'num_traces': 트레이스 수,
+                'num_samples': 샘플 수,
+            }
+        """
+        (t_idx, d_idx, chunk_number, t_start, t_end,
+         s_start, s_end, time_start, time_end) = self.records[range(len(self))[index]].tolist()
+        return {
+            'chunk_id': (t_idx, d_idx),
+            'chunk_number': chunk_number,
+            'trace_range': (t_start, t_end),
+            'sample_range': (s_start, s_end),
+            'time_range_ms': (time_start, time_end),
+            'num_traces': t_end - t_start,
+            'num_samples': s_end - s_start,
+        }
+    
+    def to_dict_list(self) -> List[Dict[str, Any]]:
+        """기존 형식의 청크 정보 dict 리스트로 변환"""
+        return list(self)
+    
+    @property
+    def grid_shape(self) -> Tuple[int, int]:
+        """(트레이스 방향 청크 수, 깊이 방향 청크 수)"""
+        if len(self) == 0:
+            return 0, 0
+        return int(self.trace_chunk_index.max()) + 1, int(self.depth_chunk_index.max()) + 1
+    
+    @property
+    def tile_shape(self) -> Tuple[int, int]:
+        """가장 큰 청크의 (트레이스 수, 샘플 수) - 규칙적인 그리드의 타일 크기"""
+        if len(self) == 0:
+            return 0, 0
+        return int(self.num_traces.max()), int(self.num_samples.max())
+    
+    @property
+    def is_regular_grid(self) -> bool:
+        """
+        모든 청크가 (0, 0)에서 시작하는 같은 크기의 타일로 빈틈없이 배치되어 있는지 여부
+        (마지막 행/열 청크만 작을 수 있음, divide_by_grid 결과는 항상 규칙적)
+        """
+        if len(self) == 0:
+            return False
+        
+        n_t, n_d = self.grid_shape
+        if len(self) != n_t * n_d:
+            return False
+        if len(set(zip(self.trace_chunk_index.tolist(), self.depth_chunk_index.tolist()))) != len(self):
+            return False
+        
+        tile_traces, tile_samples = self.tile_shape
+        total_traces, total_samples = int(self.trace_end.max()), int(self.sample_end.max())
+        trace_start = self.trace_chunk_index * tile_traces
+        sample_start = self.depth_chunk_index * tile_samples
+        return (np.array_equal(self.trace_start, trace_start)
+                and np.array_equal(self.trace_end, np.minimum(trace_start + tile_traces, total_traces))
+                and np.array_equal(self.sample_start, sample_start)
+                and np.array_equal(self.sample_end, np.minimum(sample_start + tile_samples, total_samples)))
+    
+    def pos_to_tile(self, trace_index: int, sample_index: int) -> Tuple[int, int]:
+        """
+        규칙적인 그리드에서 (트레이스, 샘플) 위치가 속한 청크 ID 계산
+        
+        Returns:
+            (trace_chunk_idx, depth_chunk_idx)
+        """
+        tile_traces, tile_samples = self.tile_shape
+        return trace_index // tile_traces, sample_index // tile_samples
 
 
 class SEGYDataDivider:
     """SEG-Y 데이터를 분할하는 클래스"""
     
-    def __init__(self, filepath: str):
+    def __init__(self, filepath: str, use_segyio_trace_loader: bool = False,
+                 loader: Optional[SEGYDataLoader] = None):
         """
         SEGYDataDivider 초기화
         
         Args:
             filepath: SEGY 파일 경로
+            use_segyio_trace_loader: True이면 numpy.memmap 대신 segyio로 트레이스 읽기
+            loader: 이미 열린 SEGYDataLoader (지정하면 파일을 다시 열지 않고 핸들을 공유,
+                    loader.filepath와 filepath는 같은 파일이어야 함)
         """
+        if loader is not None and os.path.realpath(loader.filepath) != os.path.realpath(filepath):
+            raise ValueError(f"공유된 loader의 파일({loader.filepath})이 "
+                             f"filepath({filepath})와 다릅니다.")
         self.filepath = filepath
+        self.use_segyio_trace_loader = use_segyio_trace_loader
+        self.loader = loader
         self.file = None
+        self._traces_mmap = None
         self._total_traces = None
         self._samples_per_trace = None
         self._sample_interval = None
         
     def __enter__(self):
         """Context manager 진입"""
+        if self.loader is not None:
+            # 공유된 loader의 파일 핸들과 캐시된 정보 재사용
+            if not self.loader.file:
+                raise ValueError("공유된 loader의 파일이 열리지 않았습니다.")
+            self.file = self.loader.file
+            self._total_traces = self.loader.total_traces
+            self._samples_per_trace = self.loader.samples_per_trace
+            self._sample_interval = self.loader.sample_interval
+            if not self.use_segyio_trace_loader:
+                self._traces_mmap = self.loader.traces_mmap
+            return self
+        
         self.file = segyio.open(self.filepath, ignore_geometry=True)
         self._total_traces = len(self.file.trace)
         self._samples_per_trace = self.file.bin[segyio.BinField.Samples]
         self._sample_interval = self.file.bin[segyio.BinField.Interval] / 1000  # ms
+        if not self.use_segyio_trace_loader:
+            self._traces_mmap = open_trace_memmap(self.filepath, self.file)
         return self
         
     def __exit__(self, exc_type, exc_val, exc_tb):
-        """Context manager 종료"""
-        if self.file:
+        """Context manager 종료 (공유된 loader의 파일은 loader가 닫음)"""
+        self._traces_mmap = None
+        if self.file and self.loader is None:
             self.file.close()
+        self.file = None
     
     @property
     def total_traces(self) -> int:
@@ -66,15 +347,15 @@ class SEGYDataDivider:
         Returns:
             [(시작_트레이스, 종료_트레이스), ...] 리스트
         """
+        starts, ends = self._trace_bounds(num_traces_per_chunk)
+        return list(zip(starts.tolist(), ends.tolist()))
+    
+    def _trace_bounds(self, num_traces_per_chunk: int) -> Tuple[np.ndarray, np.ndarray]:
+        """트레이스 분할 경계를 (시작 배열, 종료 배열)로 계산"""
         if num_traces_per_chunk <= 0:
             raise ValueError("청크당 트레이스 수는 양수여야 합니다.")
         
-        chunks = []
-        for start in range(0, self.total_traces, num_traces_per_chunk):
-            end = min(start + num_traces_per_chunk, self.total_traces)
-            chunks.append((start, end))
-        
-        return chunks
+        return _chunk_bounds(self.total_traces, num_traces_per_chunk)
     
     def divide_by_depth(self, depth_interval_ms: float) -> List[Tuple[int, int]]:
         """
@@ -86,6 +367,11 @@ class SEGYDataDivider:
         Returns:
             [(시작_샘플, 종료_샘플), ...] 리스트
         """
+        starts, ends = self._depth_bounds(depth_interval_ms)
+        return list(zip(starts.tolist(), ends.tolist()))
+    
+    def _depth_bounds(self, depth_interval_ms: float) -> Tuple[np.ndarray, np.ndarray]:
+        """깊이/시간 분할 경계를 (시작 샘플 배열, 종료 샘플 배열)로 계산"""
         if depth_interval_ms <= 0:
             raise ValueError("깊이 간격은 양수여야 합니다.")
         
@@ -94,15 +380,10 @@ class SEGYDataDivider:
         if samples_per_chunk == 0:
             samples_per_chunk = 1
         
-        chunks = []
-        for start in range(0, self.samples_per_trace, samples_per_chunk):
-            end = min(start + samples_per_chunk, self.samples_per_trace)
-            chunks.append((start, end))
-        
-        return chunks
+        return _chunk_bounds(self.samples_per_trace, samples_per_chunk)
     
     def divide_by_grid(self, num_traces_per_chunk: int, 
-                       depth_interval_ms: float) -> List[Dict[str, Any]]:
+                       depth_interval_ms: float) -> ChunkGrid:
         """
         트레이스와 깊이/시간을 모두 고려하여 그리드 분할
         
@@ -111,65 +392,85 @@ class SEGYDataDivider:
             depth_interval_ms: 깊이/시간 분할 간격 (ms)
             
         Returns:
-            [{
+            ChunkGrid (인덱싱 시 {
                 'chunk_id': (trace_chunk_idx, depth_chunk_idx),
                 'trace_range': (start, end),
                 'sample_range': (start, end),
                 'time_range_ms': (start, end)
-            }, ...] 리스트
+            } 형태의 dict 반환)
         """
-        trace_chunks = self.divide_by_traces(num_traces_per_chunk)
-        depth_chunks = self.divide_by_depth(depth_interval_ms)
-        
-        grid_chunks = []
-        chunk_id = 0
-        
-        for t_idx, (t_start, t_end) in enumerate(trace_chunks):
-            for d_idx, (d_start, d_end) in enumerate(depth_chunks):
-                time_start = d_start * self.sample_interval
-                time_end = d_end * self.sample_interval
-                
-                grid_chunks.append({
-                    'chunk_id': (t_idx, d_idx),
-                    'chunk_number': chunk_id,
-                    'trace_range': (t_start, t_end),
-                    'sample_range': (d_start, d_end),
-                    'time_range_ms': (time_start, time_end),
-                    'num_traces': t_end - t_start,
-                    'num_samples': d_end - d_start,
-                })
-                chunk_id += 1
-        
-        return grid_chunks
+        trace_starts, trace_ends = self._trace_bounds(num_traces_per_chunk)
+        depth_starts, depth_ends = self._depth_bounds(depth_interval_ms)
+        n_trace_chunks = len(trace_starts)
+        n_depth_chunks = len(depth_starts)
+        
+        # 트레이스 청크가 바깥, 깊이 청크가 안쪽 순서
+        t_idx = np.repeat(np.arange(n_trace_chunks), n_depth_chunks)
+        d_idx = np.tile(np.arange(n_depth_chunks), n_trace_chunks)
+        
+        # 레코드 배열을 미리 할당하고 필드별로 한 번에 채우기
+        grid = ChunkGrid.empty(n_trace_chunks * n_depth_chunks)
+        records = grid.records
+        records['trace_chunk_index'] = t_idx
+        records['depth_chunk_index'] = d_idx
+        records['chunk_number'] = np.arange(len(records))
+        records['trace_start'] = trace_starts[t_idx]
+        records['trace_end'] = trace_ends[t_idx]
+        records['sample_start'] = depth_starts[d_idx]
+        records['sample_end'] = depth_ends[d_idx]
+        records['time_start_ms'] = depth_starts[d_idx] * self.sample_interval
+        records['time_end_ms'] = depth_ends[d_idx] * self.sample_interval
+        return grid
     
     def extract_chunk(self, trace_range: Tuple[int, int], 
-                     sample_range: Tuple[int, int]) -> np.ndarray:
+                     sample_range: Tuple[int, int],
+                     out: Optional[np.ndarray] = None,
+                     order: str = 'traces_first') -> np.ndarray:
         """
         특정 범위의 데이터 청크 추출
         
         Args:
             trace_range: (시작_트레이스, 종료_트레이스)
             sample_range: (시작_샘플, 종료_샘플)
+            out: 결과를 저장할 float32 배열 (None이면 새로 할당, 같은 크기 청크 반복 시 재사용 가능)
+            order: 'traces_first' (기본, (트레이스, 샘플)) 또는 'samples_first' ((샘플, 트레이스) 연속 배열)
             
         Returns:
             추출된 데이터 배열
         """
+        samples_first = _check_order(order)
         t_start, t_end = trace_range
         s_start, s_end = sample_range
         
-        num_traces = t_end - t_start
-        num_samples = s_end - s_start
-        
-        data = np.zeros((num_traces, num_samples), dtype=np.float32)
-        
-        for i, trace_idx in enumerate(range(t_start, t_end)):
-            trace_data = self.file.trace[trace_idx]
-            data[i] = trace_data[s_start:s_end]
-        
-        return data
+        # 범위를 벗어난 요청이 잘린 청크로 반환되지 않도록 검증
+        if t_start < 0 or t_start >= self.total_traces:
+            raise ValueError(f"시작 트레이스 인덱스가 범위를 벗어났습니다.")
+        if t_end <= t_start or t_end > self.total_traces:
+            raise ValueError(f"종료 트레이스 인덱스가 올바르지 않습니다.")
+        if s_start < 0 or s_start >= self.samples_per_trace:
+            raise ValueError(f"시작 샘플 인덱스가 범위를 벗어났습니다.")
+        if s_end <= s_start or s_end > self.samples_per_trace:
+            raise ValueError(f"종료 샘플 인덱스가 올바르지 않습니다.")
+        
+        if self._traces_mmap is not None:
+            source = self._traces_mmap[t_start:t_end, s_start:s_end]
+        else:
+            # 트레이스 범위를 한 번의 segyio 호출로 읽은 뒤 샘플 범위만 복사
+            source = self.file.trace.raw[t_start:t_end][:, s_start:s_end]
+        
+        if samples_first:
+            source = source.T
+        
+        # 0으로 초기화하지 않은 버퍼에 한 번에 복사
+        if out is None:
+            out = np.empty(source.shape, dtype=np.float32)
+        np.copyto(out, source)
+        return out
     
     def save_chunk_as_npy(self, data: np.ndarray, output_path: str, 
-                         metadata: Optional[Dict] = None):
+                         metadata: Optional[Dict] = None, file_format: str = 'npy',
+                         write_metadata: bool = True,
+                         dtype: str = 'float32', verbose: bool = True) -> Tuple[str, Dict]:
         """
         청크를 NumPy 파일로 저장
         
@@ -177,40 +478,76 @@ class SEGYDataDivider:
             data: 저장할 데이터
             output_path: 출력 파일 경로 (.npy)
             metadata: 메타데이터 (별도의 .json 파일로 저장)
+            file_format: 'npy' (기본) 또는 'raw' (헤더 없는 .f32/.i16 파일, 형태는 메타데이터에 기록)
+            write_metadata: False이면 메타데이터 .json 파일을 쓰지 않음 (save_all_chunks는 manifest.json 사용)
+            dtype: 'float32' (기본) 또는 'int16' (최대 절대값 기준 양자화, scale은 메타데이터에 기록)
+            verbose: 저장 경로 출력 여부
+            
+        Returns:
+            (실제 데이터 파일 경로, 저장 정보가 추가된 메타데이터)
         """
+        if file_format not in ('npy', 'raw'):
+            raise ValueError(f"지원하지 않는 저장 형식입니다: {file_format} ('npy' 또는 'raw')")
+        if dtype not in _RAW_EXTENSIONS:
+            raise ValueError(f"지원하지 않는 저장 dtype입니다: {dtype} ('float32' 또는 'int16')")
+        
+        # 메타데이터 파일이 필요한 경우: 사용자 메타데이터, raw 형태 정보, 양자화 scale
+        needs_metadata = metadata is not None or file_format == 'raw' or dtype == 'int16'
+        metadata = dict(metadata or {}, dtype=dtype)
+        
+        if dtype == 'int16':
+            data, metadata['scale'] = quantize_chunk(data)
+        else:
+            data = data.astype(np.float32, copy=False)
+        
         # 데이터 저장
-        np.save(output_path, data)
-        print(f"청크 저장: {output_path} (shape: {data.shape})")
+        if file_format == 'raw':
+            data_path = os.path.splitext(output_path)[0] + _RAW_EXTENSIONS[dtype]
+            data.tofile(data_path)
+            # raw 파일은 형태 정보가 없으므로 메타데이터에 기록
+            metadata['shape'] = data.shape
+        else:
+            # np.save는 .npy 확장자가 없으면 붙여서 저장하므로 실제 경로를 맞춰서 반환
+            data_path = output_path if output_path.endswith('.npy') else output_path + '.npy'
+            np.save(data_path, data, allow_pickle=False)
+        if verbose:
+            print(f"청크 저장: {data_path} (shape: {data.shape})")
         
         # 메타데이터 저장
-        if metadata is not None:
-            import json
-            meta_path = output_path.replace('.npy', '_metadata.json')
+        if write_metadata and needs_metadata:
+            meta_path = os.path.splitext(output_path)[0] + '_metadata.json'
             with open(meta_path, 'w', encoding='utf-8') as f:
                 json.dump(metadata, f, indent=2, ensure_ascii=False)
-            print(f"메타데이터 저장: {meta_path}")
+            if verbose:
+                print(f"메타데이터 저장: {meta_path}")
+        
+        return data_path, metadata
     
-    def save_all_chunks(self, chunks: List[Dict[str, Any]], output_dir: str, 
-                       prefix: str = "chunk"):
+    def _save_trace_group(self, grid: ChunkGrid, indices: List[int], output_dir: str, prefix: str,
+                          save_options: Dict[str, Any],
+                          read_lock: threading.Lock) -> List[Tuple[str, Dict]]:
         """
-        모든 청크를 파일로 저장
+        같은 트레이스 범위의 청크들을 한 번의 읽기로 추출하여 저장 (save_all_chunks의 작업 단위)
         
-        Args:
-            chunks: 청크 정보 리스트 (divide_by_grid 결과)
-            output_dir: 출력 디렉토리
-            prefix: 파일명 접두사
+        Returns:
+            [(파일명, 메타데이터), ...] 리스트 (manifest.json 작성용)
         """
-        os.makedirs(output_dir, exist_ok=True)
-        
-        print(f"\n총 {len(chunks)}개 청크를 '{output_dir}'에 저장합니다...\n")
-        
-        for chunk_info in chunks:
-            chunk_num = chunk_info['chunk_number']
-            trace_range = chunk_info['trace_range']
-            sample_range = chunk_info['sample_range']
-            
-            # 데이터 추출
-            data = self.extract_chunk(trace_range, sample_range)
+        trace_range = (int(grid.trace_start[indices[0]]), int(grid.trace_end[indices[0]]))
+        full_range = (0, self.samples_per_trace)
+        
+        # 트레이스 블록을 한 번만 읽기 (segyio 파일 객체는 스레드 안전하지 않으므로 memmap이 없으면 읽기를 직렬화)
+        # (memmap 뷰와 IBM float 변환 커널은 여러 스레드에서 동시에 호출해도 안전)
+        if self._traces_mmap is not None:
+            block = self.extract_chunk(trace_range, full_range)
+        else:
+            with read_lock:
+                block = self.extract_chunk(trace_range, full_range)
+        
+        entries = []
+        for i in indices:
+            chunk_num = int(grid.chunk_number[i])
+            sample_range = (int(grid.sample_start[i]), int(grid.sample_end[i]))
+            data = block[:, sample_range[0]:sample_range[1]]
             
             # 파일명 생성
             filename = f"{prefix}_{chunk_num:04d}.npy"
@@ -218,22 +555,157 @@ class SEGYDataDivider:
             
             # 메타데이터 준비
             metadata = {
-                'chunk_id': chunk_info['chunk_id'],
+                'chunk_id': (int(grid.trace_chunk_index[i]), int(grid.depth_chunk_index[i])),
                 'chunk_number': chunk_num,
                 'trace_range': trace_range,
                 'sample_range': sample_range,
-                'time_range_ms': chunk_info['time_range_ms'],
+                'time_range_ms': (float(grid.time_start_ms[i]), float(grid.time_end_ms[i])),
                 'shape': data.shape,
                 'source_file': self.filepath,
             }
             
-            # 저장
-            self.save_chunk_as_npy(data, output_path, metadata)
+            # 저장 (메타데이터는 manifest.json에 한 번에 기록)
+            data_path, metadata = self.save_chunk_as_npy(data, output_path, metadata,
+                                                         write_metadata=False, verbose=False,
+                                                         **save_options)
+            entries.append((os.path.basename(data_path), metadata))
         
-        print(f"\n모든 청크 저장 완료!")
+        return entries
     
-    def print_division_info(self, chunks: List[Dict[str, Any]]):
+    def save_all_chunks(self, chunks: Union[ChunkGrid, List[Dict[str, Any]]], output_dir: str, 
+                       prefix: str = "chunk", max_workers: Optional[int] = None,
+                       file_format: str = 'npy', dtype: str = 'float32',
+                       verbose: bool = True):
+        """
+        모든 청크를 파일로 저장
+        
+        같은 트레이스 범위의 청크들은 트레이스 블록을 한 번만 읽은 뒤 메모리에서 깊이 방향으로 나눕니다.
+        청크별 메타데이터는 output_dir/manifest.json 하나에 {파일명: 메타데이터} 형태로 저장됩니다.
+        
+        Args:
+            chunks: divide_by_grid 결과 (ChunkGrid 또는 청크 정보 dict 리스트)
+            output_dir: 출력 디렉토리
+            prefix: 파일명 접두사
+            max_workers: 청크 추출/저장에 사용할 스레드 수 (None이면 min(8, CPU 수))
+            file_format: 'npy' 또는 'raw' (save_chunk_as_npy 참고)
+            dtype: 'float32' 또는 'int16' (save_chunk_as_npy 참고)
+            verbose: 저장 결과 요약 출력 여부 (청크별 출력 대신 마지막에 한 번에 출력)
+        """
+        os.makedirs(output_dir, exist_ok=True)
+        
+        if max_workers is None:
+            max_workers = min(8, os.cpu_count() or 1)
+        
+        if verbose:
+            print(f"\n총 {len(chunks)}개 청크를 '{output_dir}'에 저장합니다...\n")
+        
+        grid = chunks if isinstance(chunks, ChunkGrid) else ChunkGrid.from_dict_list(chunks)
+        
+        # 트레이스 범위별로 청크 인덱스 묶기
+        trace_groups: Dict[Tuple[int, int], List[int]] = {}
+        for i, trace_range in enumerate(zip(grid.trace_start.tolist(), grid.trace_end.tolist())):
+            trace_groups.setdefault(trace_range, []).append(i)
+        
+        save_options = {'file_format': file_format, 'dtype': dtype}
+        read_lock = threading.Lock()
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            group_entries = list(executor.map(
+                lambda indices: self._save_trace_group(grid, indices, output_dir, prefix,
+                                                       save_options, read_lock),
+                trace_groups.values()
+            ))
+        
+        # 모든 청크의 메타데이터를 하나의 manifest 파일로 저장
+        entries = sorted((entry for group in group_entries for entry in group),
+                         key=lambda entry: entry[1]['chunk_number'])
+        manifest_path = os.path.join(output_dir, 'manifest.json')
+        with open(manifest_path, 'w', encoding='utf-8') as f:
+            json.dump(dict(entries), f, indent=2, ensure_ascii=False)
+        
+        if verbose:
+            lines = [f"청크 저장: {os.path.join(output_dir, filename)} (shape: {tuple(metadata['shape'])})"
+                     for filename, metadata in entries]
+            lines.append(f"메타데이터 저장: {manifest_path}")
+            lines.append(f"\n모든 청크 저장 완료!")
+            sys.stdout.write('\n'.join(lines) + '\n')
+    
+    def save_chunks_as_store(self, chunks: Union[ChunkGrid, List[Dict[str, Any]]], output_path: str,
+                             dtype: str = 'float32', verbose: bool = True) -> Tuple[str, Dict[str, Any]]:
+        """
+        규칙적인 그리드의 모든 청크를 하나의 (total_traces, samples) .npy 저장소로 저장
+        
+        청크별 파일 대신 하나의 파일에 트레이스 블록 단위로 연속해서 씁니다.
+        청크 (i, j)는 저장소의 [i * tile_traces:, j * tile_samples:] 위치에 있으며
+        load_store_chunk로 읽을 수 있습니다. 메타데이터는 <저장소>_metadata.json에 저장됩니다.
+        
+        Args:
+            chunks: divide_by_grid 결과 (ChunkGrid 또는 청크 정보 dict 리스트, 규칙적인 그리드여야 함)
+            output_path: 저장소 파일 경로 (.npy)
+            dtype: 'float32' (기본) 또는 'int16' (청크별 최대 절대값 기준 양자화, scale은 메타데이터에 기록)
+            verbose: 저장 경로 출력 여부
+            
+        Returns:
+            (저장소 파일 경로, 메타데이터)
+        """
+        if dtype not in _RAW_EXTENSIONS:
+            raise ValueError(f"지원하지 않는 저장 dtype입니다: {dtype} ('float32' 또는 'int16')")
+        
+        grid = chunks if isinstance(chunks, ChunkGrid) else ChunkGrid.from_dict_list(chunks)
+        if not grid.is_regular_grid:
+            raise ValueError("규칙적인 그리드만 단일 저장소로 저장할 수 있습니다. save_all_chunks를 사용하세요.")
+        
+        n_t, n_d = grid.grid_shape
+        tile_traces, tile_samples = grid.tile_shape
+        shape = (int(grid.trace_end.max()), int(grid.sample_end.max()))
+        full_range = (0, shape[1])
+        
+        Path(output_path).parent.mkdir(parents=True, exist_ok=True)
+        store = np.lib.format.open_memmap(output_path, mode='w+', dtype=dtype, shape=shape)
+        scales = np.ones((n_t, n_d))
+        
+        for t_idx in range(n_t):
+            trace_range = (t_idx * tile_traces, min((t_idx + 1) * tile_traces, shape[0]))
+            rows = store[trace_range[0]:trace_range[1]]
+            
+            if dtype == 'float32':
+                # 저장소의 해당 행에 바로 읽어 들임 (중간 버퍼 없음)
+                self.extract_chunk(trace_range, full_range, out=rows)
+                continue
+            
+            block = self.extract_chunk(trace_range, full_range)
+            for d_idx in range(n_d):
+                cols = slice(d_idx * tile_samples, (d_idx + 1) * tile_samples)
+                rows[:, cols], scales[t_idx, d_idx] = quantize_chunk(block[:, cols])
+        
+        store.flush()
+        del store
+        
+        metadata = {
+            'shape': shape,
+            'tile_shape': (tile_traces, tile_samples),
+            'grid_shape': (n_t, n_d),
+            'dtype': dtype,
+            'sample_interval_ms': self.sample_interval,
+            'source_file': self.filepath,
+        }
+        if dtype == 'int16':
+            metadata['scales'] = scales.tolist()
+        
+        meta_path = os.path.splitext(output_path)[0] + '_metadata.json'
+        with open(meta_path, 'w', encoding='utf-8') as f:
+            json.dump(metadata, f, indent=2, ensure_ascii=False)
+        
+        if verbose:
+            print(f"저장소 저장: {output_path} (shape: {shape}, 청크 {n_t} x {n_d}개, "
+                  f"타일: {tile_traces} x {tile_samples})")
+            print(f"메타데이터 저장: {meta_path}")
+        
+        return output_path, metadata
+    
+    def print_division_info(self, chunks: Union[ChunkGrid, List[Dict[str, Any]]]):
         """분할 정보 출력"""
+        grid = chunks if isinstance(chunks, ChunkGrid) else ChunkGrid.from_dict_list(chunks)
+        
         print("=" * 80)
         print("DATA DIVISION INFORMATION")
         print("=" * 80)
@@ -241,22 +713,22 @@ class SEGYDataDivider:
         print(f"총 트레이스 수: {self.total_traces:,}")
         print(f"트레이스당 샘플 수: {self.samples_per_trace:,}")
         print(f"샘플 간격: {self.sample_interval:.3f} ms")
-        print(f"\n총 청크 수: {len(chunks)}")
+        print(f"\n총 청크 수: {len(grid)}")
         print(f"\n첫 5개 청크 정보:")
         print("-" * 80)
         
-        for chunk in chunks[:5]:
-            t_start, t_end = chunk['trace_range']
-            s_start, s_end = chunk['sample_range']
-            time_start, time_end = chunk['time_range_ms']
+        for i in range(min(5, len(grid))):
+            t_start, t_end = grid.trace_start[i], grid.trace_end[i]
+            s_start, s_end = grid.sample_start[i], grid.sample_end[i]
+            time_start, time_end = grid.time_start_ms[i], grid.time_end_ms[i]
             
-            print(f"청크 #{chunk['chunk_number']:04d} | "
-                  f"Traces: [{t_start:5d} - {t_end:5d}] ({chunk['num_traces']:4d} traces) | "
-                  f"Samples: [{s_start:5d} - {s_end:5d}] ({chunk['num_samples']:4d} samples) | "
+            print(f"청크 #{grid.chunk_number[i]:04d} | "
+                  f"Traces: [{t_start:5d} - {t_end:5d}] ({t_end - t_start:4d} traces) | "
+                  f"Samples: [{s_start:5d} - {s_end:5d}] ({s_end - s_start:4d} samples) | "
                   f"Time: [{time_start:7.2f} - {time_end:7.2f}] ms")
         
-        if len(chunks) > 5:
-            print(f"... (총 {len(chunks) - 5}개 청크 생략)")
+        if len(grid) > 5:
+            print(f"... (총 {len(grid) - 5}개 청크 생략)")
         
         print("=" * 80)
 
@@ -265,7 +737,8 @@ def divide_segy_file(filepath: str,
                      num_traces_per_chunk: int = 100,
                      depth_interval_ms: float = 500.0,
                      output_dir: Optional[str] = None,
-                     save_chunks: bool = False) -> List[Dict[str, Any]]:
+                     save_chunks: bool = False,
+                     loader: Optional[SEGYDataLoader] = None) -> ChunkGrid:
     """
     SEGY 파일을 간단하게 분할하는 함수
     
@@ -275,11 +748,16 @@ def divide_segy_file(filepath: str,
         depth_interval_ms: 깊이/시간 분할 간격 (ms)
         output_dir: 출력 디렉토리 (None이면 저장 안 함)
         save_chunks: 청크를 파일로 저장할지 여부
+        loader: 이미 열린 SEGYDataLoader (지정하면 파일을 다시 열지 않음, 분할 후 통계 계산 등에 재사용)
         
     Returns:
-        청크 정보 리스트
+        청크 정보 (ChunkGrid)
     """
-    with SEGYDataDivider(filepath) as divider:
+    with ExitStack() as stack:
+        if loader is None:
+            loader = stack.enter_context(SEGYDataLoader(filepath))
+        divider = stack.enter_context(SEGYDataDivider(filepath, loader=loader))
+        
         # 그리드 분할
         chunks = divider.divide_by_grid(num_traces_per_chunk, depth_interval_ms)
         
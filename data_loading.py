@@ -7,23 +7,39 @@ import segyio
 import numpy as np
 from typing import Optional, Tuple, List
 import warnings
+from collections.abc import Mapping
+from dataclasses import dataclass
+from functools import cached_property
+from kernels import block_moments
+from header_loading import open_trace_memmap
+
+
+def _check_order(order: str) -> bool:
+    """배열 순서 인자 검증 후 samples_first 여부 반환"""
+    if order not in ('traces_first', 'samples_first'):
+        raise ValueError(f"지원하지 않는 배열 순서입니다: {order} ('traces_first' 또는 'samples_first')")
+    return order == 'samples_first'
 
 
 class SEGYDataLoader:
     """SEG-Y 데이터를 로드하고 처리하는 클래스"""
     
-    def __init__(self, filepath: str):
+    def __init__(self, filepath: str, use_segyio_trace_loader: bool = False):
         """
         SEGYDataLoader 초기화
         
         Args:
             filepath: SEGY 파일 경로
+            use_segyio_trace_loader: True이면 numpy.memmap 대신 segyio로 트레이스 읽기
         """
         self.filepath = filepath
+        self.use_segyio_trace_loader = use_segyio_trace_loader
         self.file = None
+        self._traces_mmap = None
         self._total_traces = None
         self._samples_per_trace = None
         self._sample_interval = None
+        self._time_axis = None
         
     def __enter__(self):
         """Context manager 진입"""
@@ -31,10 +47,14 @@ class SEGYDataLoader:
         self._total_traces = len(self.file.trace)
         self._samples_per_trace = self.file.bin[segyio.BinField.Samples]
         self._sample_interval = self.file.bin[segyio.BinField.Interval] / 1000  # ms
+        if not self.use_segyio_trace_loader:
+            self._traces_mmap = open_trace_memmap(self.filepath, self.file)
         return self
         
     def __exit__(self, exc_type, exc_val, exc_tb):
         """Context manager 종료"""
+        self._traces_mmap = None
+        self._time_axis = None
         if self.file:
             self.file.close()
     
@@ -59,6 +79,11 @@ class SEGYDataLoader:
             raise ValueError("파일이 열리지 않았습니다.")
         return self._sample_interval
     
+    @property
+    def traces_mmap(self) -> Optional[np.ndarray]:
+        """트레이스 샘플 memmap 뷰 (segyio로 읽거나 memmap을 열 수 없는 파일이면 None)"""
+        return self._traces_mmap
+    
     def load_trace(self, trace_index: int) -> np.ndarray:
         """
         단일 트레이스 데이터 로드
@@ -75,22 +100,64 @@ class SEGYDataLoader:
         if trace_index < 0 or trace_index >= self.total_traces:
             raise ValueError(f"트레이스 인덱스가 범위를 벗어났습니다. (0 ~ {self.total_traces - 1})")
         
+        if self._traces_mmap is not None:
+            trace = self._traces_mmap[trace_index]
+            return trace.astype(trace.dtype.newbyteorder('='))
+        
         return self.file.trace[trace_index]
     
-    def load_traces(self, start_trace: int = 0, end_trace: Optional[int] = None) -> np.ndarray:
+    def load_traces(self, start_trace: int = 0, end_trace: Optional[int] = None,
+                    order: str = 'traces_first') -> np.ndarray:
         """
         여러 트레이스 데이터 로드
         
         Args:
             start_trace: 시작 트레이스 인덱스
             end_trace: 종료 트레이스 인덱스 (None이면 끝까지)
+            order: 'traces_first' (기본, (num_traces, samples_per_trace)) 또는
+                   'samples_first' ((samples_per_trace, num_traces) 연속 배열, imshow에 .T 없이 사용)
+            
+        Returns:
+            2D numpy 배열 (order에 따른 형태)
+        """
+        samples_first = _check_order(order)
+        end_trace = self._check_trace_range(start_trace, end_trace)
+        return self._read_block(start_trace, end_trace, 0, self.samples_per_trace,
+                                samples_first=samples_first)
+    
+    def load_selected_traces(self, trace_indices) -> np.ndarray:
+        """
+        임의 위치의 여러 트레이스를 한 번에 로드
+        
+        Args:
+            trace_indices: 트레이스 인덱스 리스트/배열
             
         Returns:
-            2D numpy 배열 (num_traces, samples_per_trace)
+            2D float32 배열 (len(trace_indices), samples_per_trace)
         """
         if not self.file:
             raise ValueError("파일이 열리지 않았습니다.")
         
+        trace_indices = np.asarray(trace_indices, dtype=np.int64)
+        if trace_indices.size and (trace_indices.min() < 0 or trace_indices.max() >= self.total_traces):
+            raise ValueError(f"트레이스 인덱스가 범위를 벗어났습니다. (0 ~ {self.total_traces - 1})")
+        
+        if self._traces_mmap is not None:
+            # memmap에서 한 번의 fancy indexing으로 모으기
+            return np.ascontiguousarray(self._traces_mmap[trace_indices], dtype=np.float32)
+        
+        # segyio는 임의 위치 묶음 읽기를 지원하지 않으므로 중복을 제거하고 트레이스별로 읽기
+        unique_indices, inverse = np.unique(trace_indices, return_inverse=True)
+        data = np.empty((len(unique_indices), self.samples_per_trace), dtype=np.float32)
+        for row, trace_index in enumerate(unique_indices.tolist()):
+            data[row] = self.file.trace.raw[trace_index]
+        return data[inverse]
+    
+    def _check_trace_range(self, start_trace: int, end_trace: Optional[int]) -> int:
+        """트레이스 범위 검증 후 종료 트레이스 인덱스 반환"""
+        if not self.file:
+            raise ValueError("파일이 열리지 않았습니다.")
+        
         if end_trace is None:
             end_trace = self.total_traces
         
@@ -100,13 +167,25 @@ class SEGYDataLoader:
         if end_trace <= start_trace or end_trace > self.total_traces:
             raise ValueError(f"종료 트레이스 인덱스가 올바르지 않습니다.")
         
-        num_traces = end_trace - start_trace
-        data = np.zeros((num_traces, self.samples_per_trace), dtype=np.float32)
-        
-        for i, trace_idx in enumerate(range(start_trace, end_trace)):
-            data[i] = self.file.trace[trace_idx]
-        
-        return data
+        return end_trace
+    
+    def _read_block(self, start_trace: int, end_trace: int,
+                    start_sample: int, end_sample: int,
+                    samples_first: bool = False) -> np.ndarray:
+        """검증된 트레이스/샘플 범위를 float32 배열로 읽기 (samples_first이면 (샘플, 트레이스) 순서)"""
+        if self._traces_mmap is not None:
+            # 필요한 샘플 범위만 memmap에서 복사
+            data = self._traces_mmap[start_trace:end_trace, start_sample:end_sample]
+        else:
+            # 트레이스 범위를 한 번의 segyio 호출로 읽기
+            data = self.file.trace.raw[start_trace:end_trace]
+            if start_sample != 0 or end_sample != self.samples_per_trace:
+                data = data[:, start_sample:end_sample]
+        
+        if samples_first:
+            # 전치 뷰를 연속 배열로 한 번만 복사
+            return np.ascontiguousarray(data.T, dtype=np.float32)
+        return np.ascontiguousarray(data, dtype=np.float32)
     
     def load_all_data(self) -> np.ndarray:
         """
@@ -143,18 +222,15 @@ class SEGYDataLoader:
         if end_sample is None:
             end_sample = self.samples_per_trace
         
-        if end_trace is None:
-            end_trace = self.total_traces
-        
         if start_sample < 0 or start_sample >= self.samples_per_trace:
             raise ValueError(f"시작 샘플 인덱스가 범위를 벗어났습니다.")
         
         if end_sample <= start_sample or end_sample > self.samples_per_trace:
             raise ValueError(f"종료 샘플 인덱스가 올바르지 않습니다.")
         
-        # 전체 트레이스 로드 후 깊이/시간 슬라이싱
-        data = self.load_traces(start_trace, end_trace)
-        return data[:, start_sample:end_sample]
+        # 필요한 깊이/시간 범위만 읽기
+        end_trace = self._check_trace_range(start_trace, end_trace)
+        return self._read_block(start_trace, end_trace, start_sample, end_sample)
     
     def get_time_axis(self, start_sample: int = 0, end_sample: Optional[int] = None) -> np.ndarray:
         """
@@ -166,12 +242,21 @@ class SEGYDataLoader:
             
         Returns:
             시간/깊이 값 배열 (ms 또는 m)
+            (전체 범위는 처음 호출 시 계산하여 캐시한 읽기 전용 배열을 반환)
         """
+        full_range = start_sample == 0 and end_sample in (None, self.samples_per_trace)
+        if full_range and self._time_axis is not None:
+            return self._time_axis
+        
         if end_sample is None:
             end_sample = self.samples_per_trace
         
         num_samples = end_sample - start_sample
         time_axis = np.arange(num_samples) * self.sample_interval + (start_sample * self.sample_interval)
+        
+        if full_range:
+            time_axis.flags.writeable = False
+            self._time_axis = time_axis
         return time_axis
     
     def get_trace_axis(self, start_trace: int = 0, end_trace: Optional[int] = None) -> np.ndarray:
@@ -190,35 +275,95 @@ class SEGYDataLoader:
         
         return np.arange(start_trace, end_trace)
     
-    def get_data_statistics(self, data: Optional[np.ndarray] = None) -> dict:
+    def get_data_statistics(self, data: Optional[np.ndarray] = None,
+                            block_size: int = 4096,
+                            reservoir_size: int = 100_000) -> dict:
         """
         데이터 통계 정보 계산
         
         Args:
-            data: 분석할 데이터 (None이면 전체 데이터 로드)
+            data: 분석할 데이터 (None이면 전체 파일을 블록 단위로 스트리밍하여 계산)
+            block_size: 스트리밍 시 한 번에 읽을 트레이스 수
+            reservoir_size: 중앙값/백분위수 계산에 사용할 최대 샘플 수
             
         Returns:
             통계 정보 딕셔너리
         """
         if data is None:
-            # 전체 데이터 로드는 메모리 문제가 있을 수 있으므로 샘플링
-            if self.total_traces > 1000:
-                warnings.warn("전체 데이터가 크므로 1000개 트레이스를 샘플링하여 통계를 계산합니다.")
-                step = self.total_traces // 1000
-                data = self.load_traces(0, self.total_traces)[::step]
-            else:
-                data = self.load_all_data()
+            return self._streaming_statistics(block_size, reservoir_size)
+        
+        # 최소/최대/평균/편차제곱합은 한 번의 블록 연산으로, 분위수는 한 번의 np.quantile 호출로 계산
+        block = data.reshape(-1, data.shape[-1]) if data.ndim > 1 else data.reshape(1, -1)
+        data_min, data_max, mean, m2 = block_moments(block)
+        p5, median, p95 = np.quantile(data, [0.05, 0.5, 0.95])
         
         stats = {
             'shape': data.shape,
             'dtype': str(data.dtype),
-            'min': float(np.min(data)),
-            'max': float(np.max(data)),
-            'mean': float(np.mean(data)),
-            'std': float(np.std(data)),
-            'median': float(np.median(data)),
-            'percentile_95': float(np.percentile(data, 95)),
-            'percentile_5': float(np.percentile(data, 5)),
+            'min': data_min,
+            'max': data_max,
+            'mean': mean,
+            'std': float(np.sqrt(m2 / data.size)),
+            'median': float(median),
+            'percentile_95': float(p95),
+            'percentile_5': float(p5),
+        }
+        
+        return stats
+    
+    def _streaming_statistics(self, block_size: int, reservoir_size: int) -> dict:
+        """
+        전체 데이터를 메모리에 올리지 않고 트레이스 블록 단위로 통계 계산
+        
+        최소/최대/평균/표준편차는 전체 데이터에 대해 정확히 계산하고 (Welford 병합),
+        중앙값/백분위수는 무작위 샘플(최대 reservoir_size개)로 추정합니다.
+        전체 샘플 수가 reservoir_size 이하이면 모든 값을 사용하므로 정확합니다.
+        """
+        total_values = self.total_traces * self.samples_per_trace
+        keep_ratio = min(1.0, reservoir_size / total_values)
+        rng = np.random.default_rng(0)
+        
+        count = 0
+        mean = 0.0
+        m2 = 0.0
+        data_min = np.inf
+        data_max = -np.inf
+        reservoir = []
+        
+        for start in range(0, self.total_traces, block_size):
+            end = min(start + block_size, self.total_traces)
+            block = self.load_traces(start, end)
+            block_min, block_max, block_mean, block_m2 = block_moments(block)
+            
+            # np.minimum/np.maximum은 NaN을 전파 (내장 min/max는 NaN을 무시할 수 있음)
+            data_min = float(np.minimum(data_min, block_min))
+            data_max = float(np.maximum(data_max, block_max))
+            
+            # 블록 평균/분산을 누적값과 병합 (Chan et al. 병렬 Welford)
+            block_count = block.size
+            delta = block_mean - mean
+            new_count = count + block_count
+            mean += delta * block_count / new_count
+            m2 += block_m2 + delta * delta * count * block_count / new_count
+            count = new_count
+            
+            block = block.reshape(-1)
+            if keep_ratio < 1.0:
+                block = block[rng.random(block_count) < keep_ratio]
+            reservoir.append(block)
+        
+        reservoir = np.concatenate(reservoir)
+        
+        stats = {
+            'shape': (self.total_traces, self.samples_per_trace),
+            'dtype': str(reservoir.dtype),
+            'min': data_min,
+            'max': data_max,
+            'mean': mean,
+            'std': float(np.sqrt(m2 / count)),
+            'median': float(np.median(reservoir)),
+            'percentile_95': float(np.percentile(reservoir, 95)),
+            'percentile_5': float(np.percentile(reservoir, 5)),
         }
         
         return stats
@@ -249,8 +394,62 @@ class SEGYDataLoader:
         print("=" * 60)
 
 
+# SEGYLoadResult에서 dict 형태로 접근 가능한 키 (기존 load_segy_data 메타데이터 키)
+_LOAD_RESULT_KEYS = (
+    'total_traces', 'samples_per_trace', 'sample_interval',
+    'loaded_traces', 'loaded_samples', 'time_axis', 'trace_axis',
+)
+
+
+@dataclass(eq=False)
+class SEGYLoadResult(Mapping):
+    """
+    load_segy_data 메타데이터
+    
+    time_axis / trace_axis는 처음 접근할 때 계산됩니다.
+    기존 dict 형태와의 호환을 위해 읽기 전용 Mapping으로도 동작합니다
+    (metadata['time_axis'], 'time_axis' in metadata, metadata.get(...), metadata.keys() 등).
+    """
+    total_traces: int
+    samples_per_trace: int
+    sample_interval: float
+    loaded_traces: Tuple[int, int]
+    loaded_samples: Tuple[int, int]
+    
+    @cached_property
+    def time_axis(self) -> np.ndarray:
+        """로드된 샘플 범위의 시간/깊이 축 (ms 또는 m)"""
+        start_sample, end_sample = self.loaded_samples
+        return (np.arange(end_sample - start_sample) * self.sample_interval
+                + start_sample * self.sample_interval)
+    
+    @cached_property
+    def trace_axis(self) -> np.ndarray:
+        """로드된 트레이스 번호 배열"""
+        return np.arange(*self.loaded_traces)
+    
+    def __getitem__(self, key: str):
+        if key not in _LOAD_RESULT_KEYS:
+            raise KeyError(key)
+        return getattr(self, key)
+    
+    def __contains__(self, key) -> bool:
+        # 키 확인만으로 시간/트레이스 축이 계산되지 않도록 키 목록만 확인
+        return key in _LOAD_RESULT_KEYS
+    
+    def __iter__(self):
+        return iter(_LOAD_RESULT_KEYS)
+    
+    def __len__(self) -> int:
+        return len(_LOAD_RESULT_KEYS)
+    
+    def to_dict(self) -> dict:
+        """기존 형식의 메타데이터 딕셔너리로 변환 (시간/트레이스 축 포함)"""
+        return {key: getattr(self, key) for key in _LOAD_RESULT_KEYS}
+
+
 def load_segy_data(filepath: str, start_trace: int = 0, end_trace: Optional[int] = None,
-                   start_sample: int = 0, end_sample: Optional[int] = None) -> Tuple[np.ndarray, dict]:
+                   start_sample: int = 0, end_sample: Optional[int] = None) -> Tuple[np.ndarray, SEGYLoadResult]:
     """
     SEGY 파일에서 데이터를 간단하게 로드하는 함수
     
@@ -262,20 +461,18 @@ def load_segy_data(filepath: str, start_trace: int = 0, end_trace: Optional[int]
         end_sample: 종료 샘플 인덱스 (None이면 끝까지)
         
     Returns:
-        (데이터 배열, 메타데이터 딕셔너리)
+        (데이터 배열, 메타데이터 SEGYLoadResult)
     """
     with SEGYDataLoader(filepath) as loader:
         data = loader.load_depth_slice(start_sample, end_sample, start_trace, end_trace)
         
-        metadata = {
-            'total_traces': loader.total_traces,
-            'samples_per_trace': loader.samples_per_trace,
-            'sample_interval': loader.sample_interval,
-            'loaded_traces': (start_trace, end_trace if end_trace else loader.total_traces),
-            'loaded_samples': (start_sample, end_sample if end_sample else loader.samples_per_trace),
-            'time_axis': loader.get_time_axis(start_sample, end_sample),
-            'trace_axis': loader.get_trace_axis(start_trace, end_trace),
-        }
+        metadata = SEGYLoadResult(
+            total_traces=loader.total_traces,
+            samples_per_trace=loader.samples_per_trace,
+            sample_interval=loader.sample_interval,
+            loaded_traces=(start_trace, end_trace if end_trace else loader.total_traces),
+            loaded_samples=(start_sample, end_sample if end_sample else loader.samples_per_trace),
+        )
         
         return data, metadata
 
@@ -9,11 +9,33 @@ import sys
 import numpy as np
 import matplotlib.pyplot as plt
 from pathlib import Path
+from typing import Optional
+from matplotlib.figure import Figure
 
 # 모듈 import
 from header_loading import SEGYHeaderLoader, load_segy_header
 from data_loading import SEGYDataLoader, load_segy_data
-from data_divide import SEGYDataDivider, divide_segy_file
+from data_divide import SEGYDataDivider
+
+# 예제 이미지 저장 해상도 (확인용 이미지이므로 낮은 DPI로 렌더링 시간 단축)
+FIGURE_DPI = 100
+
+
+def _prepare_figure(fig: Optional[Figure], figsize) -> Figure:
+    """예제에서 그릴 Figure 준비 (fig가 주어지면 내용을 지우고 크기만 바꿔 재사용)"""
+    if fig is None:
+        return plt.figure(figsize=figsize)
+    fig.clear()
+    fig.set_size_inches(*figsize)
+    return fig
+
+
+def _finish_figure(fig: Figure, output_file: str, shared: bool):
+    """Figure를 이미지로 저장하고, 예제에서 직접 만든 Figure이면 닫기"""
+    fig.tight_layout()
+    fig.savefig(output_file, dpi=FIGURE_DPI, bbox_inches='tight')
+    if not shared:
+        plt.close(fig)
 
 
 def example_1_basic_header_analysis(segy_file: str):
@@ -24,20 +46,22 @@ def example_1_basic_header_analysis(segy_file: str):
     print("예제 1: 기본 헤더 분석")
     print("="*70)
     
-    # 간단한 방법
-    info = load_segy_header(segy_file, verbose=True)
+    # 간단한 방법 (cache=True: 파일 핸들을 캐시하여 아래에서 다시 열지 않음)
+    info = load_segy_header(segy_file, verbose=True, cache=True)
     
     # 또는 클래스 사용
-    with SEGYHeaderLoader(segy_file) as loader:
+    with SEGYHeaderLoader(segy_file, cache=True) as loader:
         loader.print_textual_header()
         loader.print_trace_header_sample(0)
     
     return info
 
 
-def example_2_data_loading(segy_file: str):
+def example_2_data_loading(segy_file: str, fig: Optional[Figure] = None):
     """
     예제 2: 데이터 로드 및 시각화
+    
+    fig: 재사용할 Figure (None이면 새로 만들고 저장 후 닫음)
     """
     print("\n" + "="*70)
     print("예제 2: 데이터 로드 및 시각화")
@@ -47,37 +71,39 @@ def example_2_data_loading(segy_file: str):
         # 데이터 정보 출력
         loader.print_data_info(include_stats=True)
         
-        # 처음 100개 트레이스 로드
+        # 처음 100개 트레이스 로드 (imshow에 바로 넘길 수 있도록 (샘플, 트레이스) 순서)
         num_traces = min(100, loader.total_traces)
-        data = loader.load_traces(0, num_traces)
+        data = loader.load_traces(0, num_traces, order='samples_first')
         time_axis = loader.get_time_axis()
         
         print(f"\n로드된 데이터 형태: {data.shape}")
         
-        # 시각화
-        plt.figure(figsize=(12, 6))
-        plt.imshow(data.T, aspect='auto', cmap='seismic',
-                   extent=[0, num_traces, time_axis[-1], time_axis[0]],
-                   vmin=-np.percentile(np.abs(data), 95),
-                   vmax=np.percentile(np.abs(data), 95))
-        plt.colorbar(label='Amplitude')
-        plt.xlabel('Trace Number')
-        plt.ylabel('Time/Depth (ms)')
-        plt.title(f'SEGY Data (First {num_traces} Traces)')
-        plt.tight_layout()
+        # 시각화 (색상 범위: 절대 진폭의 95% 분위수)
+        absmax = np.quantile(np.abs(data).reshape(-1), 0.95)
+        shared = fig is not None
+        fig = _prepare_figure(fig, (12, 6))
+        ax = fig.subplots()
+        image = ax.imshow(data, aspect='auto', cmap='seismic',
+                          extent=[0, num_traces, time_axis[-1], time_axis[0]],
+                          vmin=-absmax, vmax=absmax)
+        fig.colorbar(image, ax=ax, label='Amplitude')
+        ax.set_xlabel('Trace Number')
+        ax.set_ylabel('Time/Depth (ms)')
+        ax.set_title(f'SEGY Data (First {num_traces} Traces)')
         
         # 저장
         output_file = 'example_seismic_section.png'
-        plt.savefig(output_file, dpi=150, bbox_inches='tight')
+        _finish_figure(fig, output_file, shared)
         print(f"\n시각화 이미지 저장: {output_file}")
-        plt.close()
     
     return data
 
 
-def example_3_data_division(segy_file: str):
+def example_3_data_division(segy_file: str, fig: Optional[Figure] = None):
     """
     예제 3: 데이터 분할
+    
+    fig: 재사용할 Figure (None이면 새로 만들고 저장 후 닫음)
     """
     print("\n" + "="*70)
     print("예제 3: 데이터 분할")
@@ -99,7 +125,8 @@ def example_3_data_division(segy_file: str):
             chunk = chunks[0]
             chunk_data = divider.extract_chunk(
                 chunk['trace_range'],
-                chunk['sample_range']
+                chunk['sample_range'],
+                order='samples_first'
             )
             
             print(f"\n첫 번째 청크 데이터 형태: {chunk_data.shape}")
@@ -108,21 +135,21 @@ def example_3_data_division(segy_file: str):
             t_start, t_end = chunk['trace_range']
             time_start, time_end = chunk['time_range_ms']
             
-            plt.figure(figsize=(10, 6))
-            plt.imshow(chunk_data.T, aspect='auto', cmap='seismic',
-                       extent=[t_start, t_end, time_end, time_start],
-                       vmin=-np.percentile(np.abs(chunk_data), 95),
-                       vmax=np.percentile(np.abs(chunk_data), 95))
-            plt.colorbar(label='Amplitude')
-            plt.xlabel('Trace Number')
-            plt.ylabel('Time/Depth (ms)')
-            plt.title(f'Chunk #0 Visualization')
-            plt.tight_layout()
+            absmax = np.quantile(np.abs(chunk_data).reshape(-1), 0.95)
+            shared = fig is not None
+            fig = _prepare_figure(fig, (10, 6))
+            ax = fig.subplots()
+            image = ax.imshow(chunk_data, aspect='auto', cmap='seismic',
+                              extent=[t_start, t_end, time_end, time_start],
+                              vmin=-absmax, vmax=absmax)
+            fig.colorbar(image, ax=ax, label='Amplitude')
+            ax.set_xlabel('Trace Number')
+            ax.set_ylabel('Time/Depth (ms)')
+            ax.set_title(f'Chunk #0 Visualization')
             
             output_file = 'example_chunk_0.png'
-            plt.savefig(output_file, dpi=150, bbox_inches='tight')
+            _finish_figure(fig, output_file, shared)
             print(f"청크 시각화 이미지 저장: {output_file}")
-            plt.close()
     
     return chunks
 
@@ -138,14 +165,21 @@ def example_4_save_chunks(segy_file: str, output_dir: str = './output_chunks'):
     # 출력 디렉토리 생성
     os.makedirs(output_dir, exist_ok=True)
     
-    # 분할 및 저장
-    chunks = divide_segy_file(
-        segy_file,
-        num_traces_per_chunk=100,
-        depth_interval_ms=500.0,
-        output_dir=output_dir,
-        save_chunks=True
-    )
+    with SEGYDataDivider(segy_file) as divider:
+        # 분할
+        chunks = divider.divide_by_grid(100, 500.0)
+        divider.print_division_info(chunks)
+        
+        # 규칙적인 그리드는 하나의 저장소 파일로, 그렇지 않으면 청크별 .npy 파일로 저장
+        if chunks.is_regular_grid:
+            store_path = os.path.join(output_dir, 'chunks.npy')
+            divider.save_chunks_as_store(chunks, store_path)
+            
+            file_size_mb = os.path.getsize(store_path) / (1024 * 1024)
+            print(f"\n총 {len(chunks)}개 청크가 '{store_path}'에 저장되었습니다. ({file_size_mb:.2f} MB)")
+            return chunks
+        
+        divider.save_all_chunks(chunks, output_dir)
     
     print(f"\n총 {len(chunks)}개 청크가 '{output_dir}'에 저장되었습니다.")
     
@@ -162,9 +196,11 @@ def example_4_save_chunks(segy_file: str, output_dir: str = './output_chunks'):
     return chunks
 
 
-def example_5_trace_visualization(segy_file: str):
+def example_5_trace_visualization(segy_file: str, fig: Optional[Figure] = None):
     """
     예제 5: 개별 트레이스 시각화
+    
+    fig: 재사용할 Figure (None이면 새로 만들고 저장 후 닫음)
     """
     print("\n" + "="*70)
     print("예제 5: 개별 트레이스 시각화")
@@ -183,15 +219,16 @@ def example_5_trace_visualization(segy_file: str):
         
         time_axis = loader.get_time_axis()
         
-        # 플롯
-        fig, axes = plt.subplots(1, len(trace_indices), 
-                                figsize=(16, 6), sharey=True)
+        # 선택한 트레이스를 한 번에 로드
+        traces = loader.load_selected_traces(trace_indices)
         
-        if len(trace_indices) == 1:
-            axes = [axes]
+        # 플롯
+        shared = fig is not None
+        fig = _prepare_figure(fig, (16, 6))
+        axes = fig.subplots(1, len(trace_indices), sharey=True, squeeze=False)[0]
         
         for i, trace_idx in enumerate(trace_indices):
-            trace_data = loader.load_trace(trace_idx)
+            trace_data = traces[i]
             
             axes[i].plot(trace_data, time_axis, 'b-', linewidth=0.5)
             axes[i].fill_betweenx(time_axis, 0, trace_data, 
@@ -206,17 +243,17 @@ def example_5_trace_visualization(segy_file: str):
             axes[i].invert_yaxis()
         
         axes[0].set_ylabel('Time/Depth (ms)')
-        plt.tight_layout()
         
         output_file = 'example_traces.png'
-        plt.savefig(output_file, dpi=150, bbox_inches='tight')
+        _finish_figure(fig, output_file, shared)
         print(f"트레이스 시각화 이미지 저장: {output_file}")
-        plt.close()
 
 
-def example_6_amplitude_analysis(segy_file: str):
+def example_6_amplitude_analysis(segy_file: str, fig: Optional[Figure] = None):
     """
     예제 6: 진폭 분석
+    
+    fig: 재사용할 Figure (None이면 새로 만들고 저장 후 닫음)
     """
     print("\n" + "="*70)
     print("예제 6: 진폭 분석")
@@ -237,28 +274,32 @@ def example_6_amplitude_analysis(segy_file: str):
             else:
                 print(f"  {key}: {value:.6e}")
         
+        # 히스토그램/박스 플롯이 함께 사용할 1D 뷰 (load_traces 결과는 연속 배열이므로 복사 없음)
+        flat = np.ascontiguousarray(data).reshape(-1)
+        
         # 히스토그램
-        fig, axes = plt.subplots(1, 2, figsize=(14, 5))
+        shared = fig is not None
+        fig = _prepare_figure(fig, (14, 5))
+        axes = fig.subplots(1, 2)
         
         # 히스토그램
-        axes[0].hist(data.flatten(), bins=100, edgecolor='black', alpha=0.7)
+        axes[0].hist(flat, bins=100, edgecolor='black', alpha=0.7)
         axes[0].set_xlabel('Amplitude')
         axes[0].set_ylabel('Frequency')
         axes[0].set_title('Amplitude Distribution')
         axes[0].grid(True, alpha=0.3)
         
-        # 박스 플롯
-        axes[1].boxplot([data.flatten()], vert=True)
+        # 박스 플롯 (분위수를 한 번에 계산하여 전달, 수염은 최소/최대값)
+        q_min, q1, median, q3, q_max = np.quantile(flat, [0, 0.25, 0.5, 0.75, 1.0])
+        axes[1].bxp([{'med': median, 'q1': q1, 'q3': q3,
+                      'whislo': q_min, 'whishi': q_max, 'fliers': []}])
         axes[1].set_ylabel('Amplitude')
         axes[1].set_title('Amplitude Box Plot')
         axes[1].grid(True, alpha=0.3)
         
-        plt.tight_layout()
-        
         output_file = 'example_amplitude_analysis.png'
-        plt.savefig(output_file, dpi=150, bbox_inches='tight')
+        _finish_figure(fig, output_file, shared)
         print(f"\n진폭 분석 이미지 저장: {output_file}")
-        plt.close()
 
 
 def main():
@@ -282,6 +323,9 @@ def main():
     
     print(f"\nSEGY 파일: {segy_file}")
     
+    # 시각화 예제들이 함께 사용할 Figure (예제마다 내용만 지우고 재사용)
+    fig = plt.figure()
+    
     try:
         # 예제 실행
         print("\n모든 예제를 실행합니다...")
@@ -290,10 +334,10 @@ def main():
         info = example_1_basic_header_analysis(segy_file)
         
         # 예제 2: 데이터 로드 및 시각화
-        data = example_2_data_loading(segy_file)
+        data = example_2_data_loading(segy_file, fig)
         
         # 예제 3: 데이터 분할
-        chunks = example_3_data_division(segy_file)
+        chunks = example_3_data_division(segy_file, fig)
         
         # 예제 4: 청크 저장 (사용자 선택)
         save_chunks = input("\n청크를 파일로 저장하시겠습니까? (y/n): ").lower() == 'y'
@@ -301,10 +345,10 @@ def main():
             example_4_save_chunks(segy_file)
         
         # 예제 5: 트레이스 시각화
-        example_5_trace_visualization(segy_file)
+        example_5_trace_visualization(segy_file, fig)
         
         # 예제 6: 진폭 분석
-        example_6_amplitude_analysis(segy_file)
+        example_6_amplitude_analysis(segy_file, fig)
         
         print("\n" + "="*70)
         print("모든 예제 완료!")
@@ -324,6 +368,8 @@ def main():
         print(f"\n오류 발생: {e}")
         import traceback
         traceback.print_exc()
+    finally:
+        plt.close(fig)
 
 
 if __name__ == "__main__":
@@ -3,39 +3,242 @@ SEGY Header Loading Module
 SEG-Y 파일의 헤더 정보를 로드하고 분석하는 모듈
 """
 
+import os
+import atexit
 import segyio
 import numpy as np
-from typing import Dict, Any, Tuple
+from typing import Dict, Any, Tuple, Optional, List
 import struct
 
 
+# 트레이스 헤더 이름 → segyio TraceField 매핑
+_TRACE_FIELDS = (
+    ('trace_sequence_line', segyio.TraceField.TRACE_SEQUENCE_LINE),
+    ('trace_sequence_file', segyio.TraceField.TRACE_SEQUENCE_FILE),
+    ('field_record', segyio.TraceField.FieldRecord),
+    ('trace_number', segyio.TraceField.TraceNumber),
+    ('ensemble_number', segyio.TraceField.CDP),
+    ('inline_number', segyio.TraceField.INLINE_3D),
+    ('crossline_number', segyio.TraceField.CROSSLINE_3D),
+    ('x_coordinate', segyio.TraceField.CDP_X),
+    ('y_coordinate', segyio.TraceField.CDP_Y),
+    ('scalar_coordinate', segyio.TraceField.SourceGroupScalar),
+    ('samples_in_trace', segyio.TraceField.TRACE_SAMPLE_COUNT),
+    ('sample_interval', segyio.TraceField.TRACE_SAMPLE_INTERVAL),
+)
+
+
+# Binary File Header(파일 offset 3200, 400 bytes) 구조화 dtype (SEG-Y rev1 필드 위치, big-endian)
+_BIN_HEADER_DTYPE = np.dtype({
+    'names': ['job_id', 'line_number', 'reel_number', 'traces_per_ensemble',
+              'aux_traces_per_ensemble', 'sample_interval', 'samples_per_trace',
+              'data_sample_format', 'ensemble_fold', 'sorting_code', 'measurement_system'],
+    'formats': ['>i4', '>i4', '>i4', '>i2', '>i2', '>i2', '>i2', '>i2', '>i2', '>i2', '>i2'],
+    'offsets': [0, 4, 8, 12, 14, 16, 20, 24, 26, 28, 54],
+    'itemsize': 400,
+})
+
+
+# SEG-Y 데이터 포맷 코드(0-8)로 인덱싱하는 상수 테이블 (지원하지 않는 코드는 None)
+FORMAT_NAMES = (
+    None,
+    'IBM floating point (4 bytes)',
+    '4-byte integer',
+    '2-byte integer',
+    None,
+    'IEEE floating point (4 bytes)',
+    None,
+    None,
+    '1-byte integer',
+)
+
+# 샘플당 바이트 수 (알 수 없는 코드는 4 bytes로 간주)
+FORMAT_BYTES_PER_SAMPLE = (4, 4, 4, 2, 4, 4, 4, 4, 1)
+
+# numpy.memmap으로 읽을 big-endian dtype
+# IBM floating point(1)는 원본 4 bytes를 정수로 읽은 뒤 _IBMTraceView에서 변환
+FORMAT_DTYPES = (None, '>u4', '>i4', '>i2', None, '>f4', None, None, 'i1')
+
+# 측정 시스템 코드(0-2) → 이름
+MEASUREMENT_SYSTEMS = (None, 'Meters', 'Feet')
+
+
+class _IBMTraceView:
+    """IBM float 트레이스 memmap을 인덱싱할 때마다 IEEE float32로 변환하는 읽기 전용 뷰"""
+    
+    dtype = np.dtype(np.float32)
+    
+    def __init__(self, words: np.ndarray):
+        self._words = words
+        self.shape = words.shape
+        self.ndim = words.ndim
+    
+    def __len__(self) -> int:
+        return len(self._words)
+    
+    def __getitem__(self, key) -> np.ndarray:
+        # kernels는 Numba를 import하므로 IBM float 파일을 실제로 읽을 때만 로드
+        from kernels import ibm_to_ieee
+        return ibm_to_ieee(self._words[key])
+
+
+def open_trace_memmap(filepath: str, segy_file) -> Optional[np.ndarray]:
+    """
+    SEGY 파일의 트레이스 샘플 영역을 numpy.memmap 뷰로 열기
+    
+    각 트레이스의 240 bytes 헤더를 건너뛰는 strided 뷰를 만들어
+    (total_traces, samples_per_trace) 형태로 반환합니다.
+    
+    Args:
+        filepath: SEGY 파일 경로
+        segy_file: 이미 열린 segyio 파일 객체 (포맷/크기 정보 확인용)
+        
+    Returns:
+        (total_traces, samples_per_trace) 읽기 전용 배열 (IBM float 파일은 _IBMTraceView)
+        (지원하지 않는 포맷이거나 파일 구조가 맞지 않으면 None)
+    """
+    format_code = segy_file.bin[segyio.BinField.Format]
+    if not 0 <= format_code < len(FORMAT_DTYPES) or FORMAT_DTYPES[format_code] is None:
+        return None
+    sample_dtype = FORMAT_DTYPES[format_code]
+    
+    num_ext_headers = segy_file.bin[segyio.BinField.ExtendedHeaders]
+    if num_ext_headers < 0:
+        return None
+    
+    total_traces = len(segy_file.trace)
+    samples_per_trace = len(segy_file.samples)
+    data_offset = 3600 + 3200 * num_ext_headers
+    trace_dtype = np.dtype([('header', 'V240'),
+                            ('samples', sample_dtype, (samples_per_trace,))])
+    
+    if data_offset + total_traces * trace_dtype.itemsize > os.path.getsize(filepath):
+        return None
+    
+    traces = np.memmap(filepath, dtype=trace_dtype, mode='r',
+                       offset=data_offset, shape=(total_traces,))
+    if format_code == 1:
+        return _IBMTraceView(traces['samples'])
+    return traces['samples']
+
+
+# SEGYHeaderLoader(cache=True)가 재사용하는 열린 파일 핸들 캐시 (FIFO, 최대 _OPEN_CACHE_SIZE개)
+# (실제 경로, 수정 시각 ns) → 항목 [segyio 파일 객체, 사용 중인 로더 수]
+_OPEN_CACHE_SIZE = 4
+_OPEN_CACHE: Dict[Tuple[str, int], List[Any]] = {}
+# 캐시에서 밀려났지만 아직 사용 중인 항목 (마지막 로더가 끝날 때 닫음)
+_EVICTED_IN_USE: List[List[Any]] = []
+
+
+def _retire_cache_entry(entry: List[Any]):
+    """캐시에서 뺀 항목 정리 (사용 중이 아니면 바로 닫고, 사용 중이면 마지막 사용자에게 맡김)"""
+    if entry[1] == 0:
+        entry[0].close()
+    else:
+        _EVICTED_IN_USE.append(entry)
+
+
+def _acquire_cached_file(filepath: str) -> List[Any]:
+    """
+    캐시된 파일 핸들 항목 반환 (없으면 열어서 캐시하고, 가장 오래된 항목을 내보냄)
+    
+    Returns:
+        [segyio 파일 객체, 사용 중인 로더 수] 항목 (_release_cached_file에 그대로 전달)
+    """
+    realpath = os.path.realpath(filepath)
+    key = (realpath, os.stat(realpath).st_mtime_ns)
+    
+    entry = _OPEN_CACHE.get(key)
+    if entry is None:
+        entry = [segyio.open(realpath, ignore_geometry=True), 0]
+        _OPEN_CACHE[key] = entry
+        
+        if len(_OPEN_CACHE) > _OPEN_CACHE_SIZE:
+            _retire_cache_entry(_OPEN_CACHE.pop(next(iter(_OPEN_CACHE))))
+    
+    entry[1] += 1
+    return entry
+
+
+def _release_cached_file(entry: List[Any]):
+    """_acquire_cached_file로 받은 항목의 사용 종료 (캐시에서 밀려난 항목은 마지막 사용자가 닫음)"""
+    entry[1] -= 1
+    if entry[1] == 0 and any(evicted is entry for evicted in _EVICTED_IN_USE):
+        _EVICTED_IN_USE[:] = [evicted for evicted in _EVICTED_IN_USE if evicted is not entry]
+        entry[0].close()
+
+
+@atexit.register
+def clear_file_cache():
+    """
+    캐시된 파일 핸들을 모두 정리 (프로그램 종료 시 자동 호출)
+    
+    사용 중인 로더가 없는 핸들은 바로 닫고, 사용 중인 핸들은 해당 로더가 끝날 때 닫습니다.
+    """
+    entries = list(_OPEN_CACHE.values())
+    _OPEN_CACHE.clear()
+    for entry in entries:
+        _retire_cache_entry(entry)
+    
+    # 이미 사용이 끝난 항목이 남아 있으면 닫기
+    for entry in [evicted for evicted in _EVICTED_IN_USE if evicted[1] == 0]:
+        _EVICTED_IN_USE.remove(entry)
+        entry[0].close()
+
+
 class SEGYHeaderLoader:
     """SEG-Y 헤더 정보를 로드하고 분석하는 클래스"""
     
-    def __init__(self, filepath: str):
+    def __init__(self, filepath: str, cache_trace_headers: bool = False,
+                 use_segyio_bin_header: bool = False, cache: bool = False):
         """
         SEGYHeaderLoader 초기화
         
         Args:
             filepath: SEGY 파일 경로
+            cache_trace_headers: True이면 첫 load_trace_header 호출 시 모든 트레이스 헤더를
+                                 필드별 배열로 한 번에 읽어 캐시 (여러 트레이스 조회 시 유리)
+            use_segyio_bin_header: True이면 Binary Header를 직접 파싱하지 않고 segyio로 읽음
+            cache: True이면 열린 파일 핸들을 모듈 캐시에 보관하여 같은 파일을 다시 열 때 재사용
+                   (파일이 수정되면 새로 열고, 캐시된 핸들은 프로그램 종료 시 닫힘)
         """
         self.filepath = filepath
+        self.cache_trace_headers = cache_trace_headers
+        self.use_segyio_bin_header = use_segyio_bin_header
+        self.cache = cache
         self.file = None
+        self._cache_entry = None
         self.header_info = {}
+        self._bin_header_cache = None
+        self._text_header_cache = None
+        self._hdr_arrays = None
         
     def __enter__(self):
         """Context manager 진입"""
-        self.file = segyio.open(self.filepath, ignore_geometry=True)
+        if self.cache:
+            self._cache_entry = _acquire_cached_file(self.filepath)
+            self.file = self._cache_entry[0]
+        else:
+            self.file = segyio.open(self.filepath, ignore_geometry=True)
         return self
         
     def __exit__(self, exc_type, exc_val, exc_tb):
         """Context manager 종료"""
-        if self.file:
+        # 닫힌 파일의 정보가 남지 않도록 캐시 초기화
+        self.header_info = {}
+        self._bin_header_cache = None
+        self._text_header_cache = None
+        self._hdr_arrays = None
+        if self._cache_entry is not None:
+            # 캐시된 핸들은 닫지 않고 반환
+            _release_cached_file(self._cache_entry)
+            self._cache_entry = None
+        elif self.file:
             self.file.close()
     
     def load_textual_header(self) -> str:
         """
-        Textual File Header 로드 (3200 bytes)
+        Textual File Header 로드 (3200 bytes, 처음 호출 시 읽어 캐시)
         
         Returns:
             텍스트 헤더 문자열
@@ -43,12 +246,13 @@ class SEGYHeaderLoader:
         if not self.file:
             raise ValueError("파일이 열리지 않았습니다. with 문을 사용하세요.")
         
-        text_header = self.file.text[0]
-        return text_header
+        if self._text_header_cache is None:
+            self._text_header_cache = self.file.text[0]
+        return self._text_header_cache
     
     def load_binary_header(self) -> Dict[str, Any]:
         """
-        Binary File Header 로드 (400 bytes)
+        Binary File Header 로드 (400 bytes, 처음 호출 시 읽어 캐시)
         
         Returns:
             바이너리 헤더 정보 딕셔너리
@@ -56,6 +260,15 @@ class SEGYHeaderLoader:
         if not self.file:
             raise ValueError("파일이 열리지 않았습니다.")
         
+        if self._bin_header_cache is not None:
+            return self._bin_header_cache
+        
+        if not self.use_segyio_bin_header:
+            # 400 bytes를 한 번 읽어 구조화 dtype으로 모든 필드를 해석
+            raw = np.fromfile(self.filepath, dtype=_BIN_HEADER_DTYPE, count=1, offset=3200)[0]
+            self._bin_header_cache = {name: int(raw[name]) for name in _BIN_HEADER_DTYPE.names}
+            return self._bin_header_cache
+        
         bin_header = self.file.bin
         
         header_dict = {
@@ -72,6 +285,7 @@ class SEGYHeaderLoader:
             'measurement_system': bin_header[segyio.BinField.MeasurementSystem],
         }
         
+        self._bin_header_cache = header_dict
         return header_dict
     
     def load_trace_header(self, trace_index: int = 0) -> Dict[str, Any]:
@@ -90,28 +304,46 @@ class SEGYHeaderLoader:
         if trace_index >= len(self.file.trace):
             raise ValueError(f"트레이스 인덱스가 범위를 벗어났습니다. (최대: {len(self.file.trace) - 1})")
         
+        if self._hdr_arrays is None and self.cache_trace_headers:
+            self._build_header_arrays()
+        
+        if self._hdr_arrays is not None:
+            return {name: int(values[trace_index]) for name, values in self._hdr_arrays.items()}
+        
         trace_header = self.file.header[trace_index]
         
-        header_dict = {
-            'trace_sequence_line': trace_header[segyio.TraceField.TRACE_SEQUENCE_LINE],
-            'trace_sequence_file': trace_header[segyio.TraceField.TRACE_SEQUENCE_FILE],
-            'field_record': trace_header[segyio.TraceField.FieldRecord],
-            'trace_number': trace_header[segyio.TraceField.TraceNumber],
-            'ensemble_number': trace_header[segyio.TraceField.CDP],
-            'inline_number': trace_header[segyio.TraceField.INLINE_3D],
-            'crossline_number': trace_header[segyio.TraceField.CROSSLINE_3D],
-            'x_coordinate': trace_header[segyio.TraceField.CDP_X],
-            'y_coordinate': trace_header[segyio.TraceField.CDP_Y],
-            'scalar_coordinate': trace_header[segyio.TraceField.SourceGroupScalar],
-            'samples_in_trace': trace_header[segyio.TraceField.TRACE_SAMPLE_COUNT],
-            'sample_interval': trace_header[segyio.TraceField.TRACE_SAMPLE_INTERVAL],
+        return {name: trace_header[field] for name, field in _TRACE_FIELDS}
+    
+    def _build_header_arrays(self):
+        """모든 트레이스 헤더를 필드별 배열로 한 번에 읽어 캐시"""
+        self._hdr_arrays = {
+            name: self.file.attributes(field)[:] for name, field in _TRACE_FIELDS
         }
+    
+    def load_trace_headers(self, indices=None) -> Dict[str, np.ndarray]:
+        """
+        여러 트레이스의 헤더 정보를 필드별 배열로 로드
         
-        return header_dict
+        Args:
+            indices: 트레이스 인덱스 (정수 배열/리스트 또는 slice, None이면 전체)
+            
+        Returns:
+            {필드명: 값 배열} 딕셔너리
+        """
+        if not self.file:
+            raise ValueError("파일이 열리지 않았습니다.")
+        
+        if self._hdr_arrays is None:
+            self._build_header_arrays()
+        
+        if indices is None:
+            return dict(self._hdr_arrays)
+        
+        return {name: values[indices] for name, values in self._hdr_arrays.items()}
     
     def get_file_info(self) -> Dict[str, Any]:
         """
-        전체 SEGY 파일의 기본 정보를 가져오기
+        전체 SEGY 파일의 기본 정보를 가져오기 (처음 호출 시 계산하여 self.header_info에 캐시)
         
         Returns:
             파일 정보 딕셔너리
@@ -119,6 +351,9 @@ class SEGYHeaderLoader:
         if not self.file:
             raise ValueError("파일이 열리지 않았습니다.")
         
+        if self.header_info:
+            return self.header_info
+        
         bin_header = self.load_binary_header()
         
         # 샘플 간격을 초 단위로 변환
@@ -133,28 +368,19 @@ class SEGYHeaderLoader:
         
         # 데이터 포맷
         format_code = bin_header['data_sample_format']
-        format_dict = {
-            1: 'IBM floating point (4 bytes)',
-            2: '4-byte integer',
-            3: '2-byte integer',
-            5: 'IEEE floating point (4 bytes)',
-            8: '1-byte integer'
-        }
-        data_format = format_dict.get(format_code, f'Unknown ({format_code})')
+        known_format = 0 <= format_code < len(FORMAT_NAMES)
+        data_format = (known_format and FORMAT_NAMES[format_code]) or f'Unknown ({format_code})'
         
         # 측정 시스템
         measurement_system = bin_header['measurement_system']
-        measurement_dict = {
-            1: 'Meters',
-            2: 'Feet'
-        }
-        measurement = measurement_dict.get(measurement_system, 'Unknown')
+        measurement = (0 <= measurement_system < len(MEASUREMENT_SYSTEMS)
+                       and MEASUREMENT_SYSTEMS[measurement_system]) or 'Unknown'
         
         # 총 시간/깊이 범위
         total_time_depth = samples_per_trace * sample_interval_ms
         
         # 데이터 크기 계산 (MB)
-        bytes_per_sample = {1: 4, 2: 4, 3: 2, 5: 4, 8: 1}.get(format_code, 4)
+        bytes_per_sample = FORMAT_BYTES_PER_SAMPLE[format_code] if known_format else 4
         total_data_size_mb = (total_traces * samples_per_trace * bytes_per_sample) / (1024 * 1024)
         
         info = {
@@ -215,18 +441,19 @@ class SEGYHeaderLoader:
         print("=" * 60)
 
 
-def load_segy_header(filepath: str, verbose: bool = True) -> Dict[str, Any]:
+def load_segy_header(filepath: str, verbose: bool = True, cache: bool = False) -> Dict[str, Any]:
     """
     SEGY 파일의 헤더 정보를 간단하게 로드하는 함수
     
     Args:
         filepath: SEGY 파일 경로
         verbose: 상세 정보 출력 여부
+        cache: True이면 열린 파일 핸들을 캐시하여 이후 SEGYHeaderLoader(cache=True)에서 재사용
         
     Returns:
         파일 정보 딕셔너리
     """
-    with SEGYHeaderLoader(filepath) as loader:
+    with SEGYHeaderLoader(filepath, cache=cache) as loader:
         info = loader.get_file_info()
         
         if verbose: